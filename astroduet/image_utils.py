@@ -157,7 +157,8 @@ def sim_galaxy(patch_size,pixel_size,gal_type=None,gal_params=None,duet=None,ban
 
 def construct_image(frame,exposure,
                     duet=None,band=None,
-                    gal_type=None,gal_params=None,source=None,source_loc=None,sky_rate=None,n_exp=1, duet_no=None):
+                    gal_type=None,gal_params=None,source=None,source_loc=None,sky_rate=None,n_exp=1, duet_no=None,
+                    out=None):
 
     """Construct a simualted image with an optional background galaxy and source.
 
@@ -210,6 +211,10 @@ def construct_image(frame,exposure,
     duet_no : int (1 or 2)
         DUET band number (defaults to DUET1)
 
+    out : ``numpy.array``
+        Optional NxM array to co-add the exposures into, instead of allocating
+        a new one. The returned image shares its memory.
+
     Returns
     -------
 
@@ -283,7 +288,11 @@ def construct_image(frame,exposure,
     im_counts = (im_binned * exposure)
 
     # Co-add a number of separate exposures
-    im_final = np.zeros(frame)
+    if out is None:
+        im_final = np.zeros(frame)
+    else:
+        im_final = out
+        im_final[:] = 0
     for i in range(n_exp):
         # Apply Poisson noise and instrument read noise. Note that read noise here
         # is
@@ -296,7 +305,7 @@ def construct_image(frame,exposure,
         im_final += im_noise
 
     # Return image
-    return im_final * im_counts.unit
+    return u.Quantity(im_final, im_counts.unit, copy=False)
 
 def estimate_background(image, method='1D', sigma=3, diag=False):
     '''Background estimation.
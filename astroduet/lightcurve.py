@@ -1,16 +1,17 @@
 import os
 import copy
 import pickle
+from functools import partial
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 
-from scipy.interpolate import interp1d
-
-from astropy.table import Table, QTable
+from astropy.table import QTable
 from astropy import log
 import astropy.units as u
 from .duet_sensitivity import calc_snr
-from .utils import get_neff, suppress_stdout, mkdir_p
+from .utils import get_neff, suppress_stdout, mkdir_p, njit
 from .utils import tqdm as imported_tqdm
 from .utils import contiguous_regions, duet_fluence_to_abmag
 from .bbmag import sigerr
@@ -24,20 +25,78 @@ from .diff_image import calculate_diff_image
 def join_equal_gti_boundaries(gti):
     """If the start of a GTI is right at the end of another, join them.
 
+    Examples
+    --------
+    >>> gti = np.array([[1, 2], [2, 4], [4, 5], [6, 7]])
+    >>> np.all(join_equal_gti_boundaries(gti) == [[1, 5], [6, 7]])
+    True
     """
-    new_gtis = gti
+    if len(gti) < 2:
+        return gti
     touching = gti[:-1, 1] == gti[1:, 0]
-    if np.any(touching):
-        ng = []
-        count = 0
-        while count < len(gti) - 1:
-            if new_gtis[count, 1] == gti[count + 1, 0]:
-                ng.append([gti[count, 0], gti[count + 1, 1]])
-            else:
-                ng.append(gti[count])
-            count += 1
-        new_gtis = np.asarray(ng)
-    return new_gtis
+    # Starts are kept unless they continue the previous interval, ends are
+    # kept unless the next interval continues them.
+    keep_start = np.concatenate(([True], ~touching))
+    keep_end = np.concatenate((~touching, [True]))
+    return np.column_stack((gti[keep_start, 0], gti[keep_end, 1]))
+
+
+@njit(cache=True)
+def _cross_two_gtis_core(conc_start, conc_end, conc_tag,
+                         gti0_start, gti0_end, gti1_start, gti1_end):
+    """Inner loop of ``cross_two_gtis``, on time-ordered concatenated GTIs.
+
+    ``conc_tag`` is False for intervals from the first series and True for
+    intervals from the second one. Each series must be sorted and
+    non-overlapping, so that both starts and ends are increasing.
+    """
+    # Index of the last opening strictly before each end, in both series
+    prev_start0 = np.searchsorted(gti0_start, conc_end, side='left') - 1
+    prev_start1 = np.searchsorted(gti1_start, conc_end, side='left') - 1
+
+    last_end = conc_start[0] - 1
+    final_gti = np.empty((conc_end.size, 2))
+    ngti = 0
+    for ie in range(conc_end.size):
+        e = conc_end[ie]
+        # Is this ending in series 0 or 1?
+        if conc_tag[ie]:
+            this_start, other_start, other_end = \
+                gti1_start, gti0_start, gti0_end
+            st_pos, so_pos = prev_start1[ie], prev_start0[ie]
+        else:
+            this_start, other_start, other_end = \
+                gti0_start, gti1_start, gti1_end
+            st_pos, so_pos = prev_start0[ie], prev_start1[ie]
+
+        # Check that this closes intervals in both series.
+        # 1. Check that there is an opening in both series 0 and 1 lower than e
+        if st_pos < 0 or so_pos < 0:
+            continue
+        st = this_start[st_pos]
+        so = other_start[so_pos]
+
+        s = max(st, so)
+
+        # If this start is inside the last interval (It can happen for equal
+        # GTI start times between the two series), then skip!
+        if s <= last_end:
+            continue
+        # 2. Check that there is no closing before e in the "other series",
+        # from intervals starting either after s, or starting and ending
+        # between the last closed interval and this one
+        condition = other_end[so_pos] < s or \
+            np.searchsorted(other_end, s, side='right') < \
+            np.searchsorted(other_end, e, side='left')
+        # Well, if none of the conditions at point 2 apply, then you can
+        # create the new gti!
+        if not condition:
+            final_gti[ngti, 0] = s
+            final_gti[ngti, 1] = e
+            ngti += 1
+            last_end = e
+
+    return final_gti[:ngti]
 
 
 def cross_two_gtis(gti0, gti1):
@@ -72,6 +131,19 @@ def cross_two_gtis(gti0, gti1):
     >>> newgti = cross_two_gtis(gti1, gti2)
     >>> np.all(newgti == [[1, 4]])
     True
+    >>> gti1 = np.array([[0, 10], [20, 30]])
+    >>> gti2 = np.array([[5, 25]])
+    >>> newgti = cross_two_gtis(gti1, gti2)
+    >>> np.all(newgti == [[5, 10], [20, 25]])
+    True
+    >>> gti1 = np.array([[0, 10], [20, 30], [40, 50]])
+    >>> gti2 = np.array([[5, 22], [25, 45]])
+    >>> newgti = cross_two_gtis(gti1, gti2)
+    >>> np.all(newgti == [[5, 10], [20, 22], [25, 30], [40, 45]])
+    True
+    >>> newgti = cross_two_gtis([[0, 1]], [[2, 3]])
+    >>> newgti.shape
+    (0, 2)
     """
     gti0 = join_equal_gti_boundaries(np.asarray(gti0))
     gti1 = join_equal_gti_boundaries(np.asarray(gti1))
@@ -84,10 +156,6 @@ def cross_two_gtis(gti0, gti1):
     gti1_start = gti1[:, 0]
     gti1_end = gti1[:, 1]
 
-    # Create a list that references to the two start and end series
-    gti_start = [gti0_start, gti1_start]
-    gti_end = [gti0_end, gti1_end]
-
     # Concatenate the series, while keeping track of the correct origin of
     # each start and end time
     gti0_tag = np.array([0 for g in gti0_start], dtype=bool)
@@ -102,44 +170,12 @@ def cross_two_gtis(gti0, gti1):
     conc_end = conc_end[order]
     conc_tag = conc_tag[order]
 
-    last_end = conc_start[0] - 1
-    final_gti = []
-    for ie, e in enumerate(conc_end):
-        # Is this ending in series 0 or 1?
-        this_series = int(conc_tag[ie])
-        other_series = int(this_series == 0)
-
-        # Check that this closes intervals in both series.
-        # 1. Check that there is an opening in both series 0 and 1 lower than e
-        try:
-            st_pos = \
-                np.argmax(gti_start[this_series][gti_start[this_series] < e])
-            so_pos = \
-                np.argmax(gti_start[other_series][gti_start[other_series] < e])
-            st = gti_start[this_series][st_pos]
-            so = gti_start[other_series][so_pos]
-
-            s = np.max([st, so])
-        except:  # pragma: no cover
-            continue
-
-        # If this start is inside the last interval (It can happen for equal
-        # GTI start times between the two series), then skip!
-        if s <= last_end:
-            continue
-        # 2. Check that there is no closing before e in the "other series",
-        # from intervals starting either after s, or starting and ending
-        # between the last closed interval and this one
-        cond1 = (gti_end[other_series] > s) * (gti_end[other_series] < e)
-        cond2 = gti_end[other_series][so_pos] < s
-        condition = np.any(np.logical_or(cond1, cond2))
-        # Well, if none of the conditions at point 2 apply, then you can
-        # create the new gti!
-        if not condition:
-            final_gti.append([s, e])
-            last_end = e
-
-    return np.array(final_gti)
+    return _cross_two_gtis_core(conc_start.astype(float),
+                                conc_end.astype(float), conc_tag,
+                                gti0_start.astype(float),
+                                gti0_end.astype(float),
+                                gti1_start.astype(float),
+                                gti1_end.astype(float))
 
 
 def get_visibility_windows(observation_start : float, observation_end : float,
@@ -173,15 +209,17 @@ def get_visibility_windows(observation_start : float, observation_end : float,
     >>> ow = get_visibility_windows(0, 5760 * 2)
     >>> np.allclose(ow, [[0, 2100], [5760, 7860]])
     True
+    >>> ow = get_visibility_windows(0, 6000)
+    >>> np.allclose(ow, [[0, 2100], [5760, 6000]])
+    True
     """
     tstart = observation_start + orbital_period * phase_start
     start_times = np.arange(tstart, observation_end + orbital_period, orbital_period)
-    end_times = start_times + exposure_per_orbit
-    obs_windows = np.array(list(zip(start_times, end_times)))
-    good = (start_times < observation_end)
-    obs_windows[end_times > observation_end] = observation_end
+    good = start_times < observation_end
+    start_times = start_times[good]
+    end_times = np.minimum(start_times + exposure_per_orbit, observation_end)
 
-    return obs_windows[good]
+    return np.column_stack((start_times, end_times))
 
 
 def calculate_flux(time : float, flux : float):
@@ -194,8 +232,70 @@ def calculate_flux(time : float, flux : float):
     >>> np.isclose(calculate_flux(time, flux), 30)
     True
     """
-    dt = np.mean(np.diff(time))
-    return np.sum(flux * dt) / (time[-1] - time[0] + dt)
+    # Each sample is weighted by the mean time step, and the total time is
+    # the span plus one step: this reduces to the mean of the samples.
+    return np.mean(flux)
+
+
+@njit(cache=True)
+def _exposure_fluxes(model_time, model_lc, expo_starts, expo_len, n_sub=10):
+    """Average the model over each exposure, sampled at ``n_sub`` points.
+
+    The model is linearly interpolated and is zero outside ``model_time``,
+    which must be increasing.
+    """
+    slopes = np.diff(model_lc) / np.diff(model_time)
+    last = model_time.size - 1
+    fluxes = np.empty(expo_starts.size)
+    step = expo_len / (n_sub - 1)
+    for i in range(expo_starts.size):
+        # Model interval containing the start of the exposure. The
+        # sub-samples are increasing, so from there we just walk forward.
+        j = np.searchsorted(model_time, expo_starts[i], side='right') - 1
+        total = 0.
+        for k in range(n_sub):
+            t = expo_starts[i] + k * step
+            if t < model_time[0] or t > model_time[last]:
+                continue
+            while j < last and model_time[j + 1] <= t:
+                j += 1
+            if j == last:
+                total += model_lc[last]
+            else:
+                total += model_lc[j] + slopes[j] * (t - model_time[j])
+        # Same as calculate_flux on the sub-samples
+        fluxes[i] = total / n_sub
+    return fluxes
+
+
+def _exposure_start_times(model_time, observing_windows=None,
+                          visibility_windows=None,
+                          exposure_length=300 * u.s, **kwargs):
+    """Start times of the exposures, in seconds, without units.
+
+    See ``calculate_lightcurve_from_model`` for the parameters.
+    """
+    # All the window arithmetic is done on plain arrays of seconds
+    if observing_windows is None:
+        observing_windows = np.array([model_time[[0, -1]].to(u.s).value])
+    else:
+        observing_windows = observing_windows.to(u.s).value
+
+    if visibility_windows is None:
+        visibility_windows = \
+            get_visibility_windows(observing_windows.min(),
+                                   observing_windows.max(),
+                                   **kwargs)
+    else:
+        visibility_windows = visibility_windows.to(u.s).value
+
+    observing_windows = cross_two_gtis(observing_windows, visibility_windows)
+
+    expo_len = exposure_length.to(u.s).value
+    expo_starts = np.concatenate(
+        [np.zeros(0)] + [np.arange(ow[0], ow[1], expo_len)
+                         for ow in observing_windows])
+    return expo_starts
 
 
 def calculate_lightcurve_from_model(model_time, model_lc,
@@ -207,7 +307,7 @@ def calculate_lightcurve_from_model(model_time, model_lc,
     Parameters
     ----------
     model_time : ``astropy.units.s``
-        Times at which the model is calculated
+        Times at which the model is calculated, in increasing order
     model_lc : any ``astropy.units`` object expressing flux
         Values of the model
 
@@ -223,37 +323,21 @@ def calculate_lightcurve_from_model(model_time, model_lc,
         Additional keyword arguments to be passed to
         ``get_observing_windows``
     """
-    observing_windows = np.array([[model_time[0].to(u.s).value,
-                                   model_time[-1].to(u.s).value]]) * u.s \
-        if observing_windows is None else observing_windows
-
-    if visibility_windows is None:
-        visibility_windows = \
-            get_visibility_windows(observing_windows.min().to(u.s).value,
-                                   observing_windows.max().to(u.s).value,
-                                   **kwargs) * u.s
-
-    observing_windows = cross_two_gtis(observing_windows,
-                                       visibility_windows) * u.s
-
-    interpolated_lc = interp1d(model_time.to(u.s).value,
-                               model_lc.value, fill_value=0,
-                               bounds_error=False)
-    times = []
-    lc = []
-    for ow in observing_windows:
-        expo_times = np.arange(ow[0].value, ow[1].value,
-                               exposure_length.value) * u.s
-        for t in expo_times:
-            times.append((t + exposure_length / 2).to(u.s).value)
-            fine_times = np.linspace(t.value, (t + exposure_length).value, 10)
-            fine_model = interpolated_lc(fine_times)
-            flux = calculate_flux(fine_times * u.s, fine_model)
-            lc.append(flux)
+    expo_starts = _exposure_start_times(model_time,
+                                        observing_windows=observing_windows,
+                                        visibility_windows=visibility_windows,
+                                        exposure_length=exposure_length,
+                                        **kwargs)
+    expo_len = exposure_length.to(u.s).value
+    times = expo_starts + expo_len / 2
+
+    lc = _exposure_fluxes(model_time.to(u.s).value.astype(float),
+                          model_lc.value.astype(float),
+                          expo_starts, expo_len)
 
     result_table = QTable()
-    result_table['time'] = np.array(times) * u.s
-    result_table['Light curve'] = np.array(lc) * model_lc.unit
+    result_table['time'] = times * u.s
+    result_table['Light curve'] = lc * model_lc.unit
 
     return result_table
 
@@ -329,43 +413,44 @@ def get_lightcurve(input_lc_file, distance=10*u.pc, observing_windows=None,
     result_table = QTable()
 
     background = background_pixel_rate(duet, low_zodi=low_zodi)
-    background = {'bkg_D1': background[0], 'bkg_D2': background[1]}
-
-    for duet_no in range(1, 3):
-        duet_label = f'D{duet_no}'
-
-        table_photflux = \
-            calculate_lightcurve_from_model(
-                model_lc_table['time'],
-                model_lc_table[f'fluence_{duet_label}'],
-                exposure_length=exposure,
-                observing_windows=observing_windows,
-                **kwargs)
-
-        table_ab = \
-            calculate_lightcurve_from_model(
-                model_lc_table['time'],
-                model_lc_table[f'mag_{duet_label}'],
-                exposure_length=exposure,
-                observing_windows=observing_windows,
-                **kwargs)
-
-        if duet_no == 1:
-            result_table['time'] = table_photflux['time']
-
-        result_table[f'fluence_{duet_label}'] = \
-            table_photflux['Light curve'].to(u.ph / u.cm**2 / u.s)
-
-        rate = duet.fluence_to_rate(result_table[f'fluence_{duet_label}'])
-
-        result_table[f'snr_{duet_label}'] = \
-            duet.calc_snr(exposure, rate, background[f'bkg_{duet_label}']) \
-                * u.dimensionless_unscaled
-
-        abmag = table_ab['Light curve']
+    background = u.Quantity([background[0], background[1]])
+
+    # The exposures are the same for all bands: calculate them only once
+    expo_starts = _exposure_start_times(model_lc_table['time'],
+                                        observing_windows=observing_windows,
+                                        exposure_length=exposure,
+                                        **kwargs)
+    expo_len = exposure.to(u.s).value
+    model_time = model_lc_table['time'].to(u.s).value.astype(float)
+
+    fluence_unit = u.ph / u.cm**2 / u.s
+    fluences = np.zeros((2, expo_starts.size))
+    abmags = []
+    for i, duet_label in enumerate(['D1', 'D2']):
+        fluences[i] = _exposure_fluxes(
+            model_time,
+            model_lc_table[f'fluence_{duet_label}'].to(fluence_unit).value,
+            expo_starts, expo_len)
+        model_mag = model_lc_table[f'mag_{duet_label}']
+        abmags.append(
+            _exposure_fluxes(model_time, model_mag.value,
+                             expo_starts, expo_len) * model_mag.unit)
+    fluences = fluences * fluence_unit
+
+    # Both detectors at once, with the background broadcast along time
+    rates = duet.fluence_to_rate(fluences)
+    snrs = duet.calc_snr(exposure, rates, background[:, np.newaxis]) \
+        * u.dimensionless_unscaled
+
+    result_table['time'] = (expo_starts + expo_len / 2) * u.s
+    for i, duet_label in enumerate(['D1', 'D2']):
+        result_table[f'fluence_{duet_label}'] = fluences[i]
+        result_table[f'snr_{duet_label}'] = snrs[i]
+
+        abmag = abmags[i]
         abmag_err = sigerr(abmag)
         result_table[f'mag_{duet_label}'] = abmag
-        result_table[f'mag_{duet_label}_err'] =  abmag_err
+        result_table[f'mag_{duet_label}_err'] = abmag_err
 
     return result_table
 
@@ -475,21 +560,25 @@ def rebin_lightcurve(lightcurve, exposure, final_resolution, debug=False, debugf
         _decide_bins_to_group(lightcurve, exposure,
                               final_resolution,
                               tolerance=final_resolution)
-    time_bin = lightcurve['time_bin']
+    time_bin = np.asarray(lightcurve['time_bin'])
     good = time_bin >= 0
-    plain_lc = Table(copy.deepcopy(lightcurve[good]))
-    plain_lc['nbin'] = 1
-    # time_bin = (plain_lc['time'] // final_resolution).to("").value
-    lc_group = plain_lc.group_by(time_bin)
-    plain_lc = lc_group.groups.aggregate(np.sum)
+    time_bin = time_bin[good]
+    # Times are sorted, so each bin is a contiguous run of rows
+    if time_bin.size > 0:
+        bin_starts = \
+            np.concatenate(([0], np.flatnonzero(np.diff(time_bin)) + 1))
+    else:
+        bin_starts = np.zeros(0, dtype=int)
+    nbin = np.diff(np.append(bin_starts, time_bin.size))
     cols = 'time,fluence_D1,fluence_D2'.split(',')
-    if 'imgs_D1' in plain_lc.colnames:
+    if 'imgs_D1' in lightcurve.colnames:
         cols += 'imgs_D1,imgs_D2,imgs_D1_bkgsub,imgs_D2_bkgsub'.split(',')
     for col in cols:
-        new_lightcurve[col] = [value / nb
-                               for value, nb in zip(plain_lc[col],
-                                                    plain_lc['nbin'])] * lightcurve[col].unit
-    new_lightcurve['nbin'] = plain_lc['nbin']
+        values = np.asarray(lightcurve[col][good])
+        sums = np.add.reduceat(values, bin_starts, axis=0)
+        nb = nbin.reshape((-1,) + (1,) * (values.ndim - 1))
+        new_lightcurve[col] = sums / nb * lightcurve[col].unit
+    new_lightcurve['nbin'] = nbin
     if debug:
         new_lightcurve.write(debugfilename, path='default',
                              overwrite=True)
@@ -543,36 +632,43 @@ def construct_images_from_lightcurve(lightcurve, exposure, duet=None,
     lightcurve['imgs_D2_bkgsub'] = \
         np.zeros((len(lightcurve), frame[0], frame[1])) * u.ph / u.s
 
+    # Convert all fluences at once, rather than one Quantity per row
+    rates_D1 = duet.fluence_to_rate(lightcurve['fluence_D1'])
+    rates_D2 = duet.fluence_to_rate(lightcurve['fluence_D2'])
+
+    # Simulated counts are co-added into the same buffer for every image,
+    # and count rates are written directly into the table.
+    image_buffer = np.zeros(frame)
+    expo_val = exposure.to(u.s).value
+    imgs_D1 = lightcurve['imgs_D1'].value
+    imgs_D2 = lightcurve['imgs_D2'].value
+
     log.info('Creating images')
-    for i, row in enumerate(tqdm(lightcurve)):
-        fl1 = duet.fluence_to_rate(row['fluence_D1'])
-        fl2 = duet.fluence_to_rate(row['fluence_D2'])
+    for i in tqdm(range(len(lightcurve))):
+        fl1 = rates_D1[i]
+        fl2 = rates_D2[i]
 
         with suppress_stdout():
             image1 = construct_image(frame, exposure, duet=duet,
                                      band=duet.bandpass1,
                                      source=fl1, gal_type=gal_type,
                                      gal_params=gal_params,
-                                     sky_rate=bgd_band1)
-        image_rate1 = image1 / exposure
+                                     sky_rate=bgd_band1, out=image_buffer)
+        np.divide(image1.to_value(u.ph), expo_val, out=imgs_D1[i])
+        image_rate1 = lightcurve['imgs_D1'][i]
         image_bkg, image_bkg_rms_median = \
             estimate_background(image_rate1, method='1D', sigma=2)
-        image_rate_bkgsub = image_rate1 - image_bkg
-
-        lightcurve['imgs_D1'][i] = image_rate1
-        lightcurve['imgs_D1_bkgsub'][i] = image_rate_bkgsub
+        lightcurve['imgs_D1_bkgsub'][i] = image_rate1 - image_bkg
 
         with suppress_stdout():
             image2 = construct_image(frame, exposure, duet=duet, band=duet.bandpass2,
                                      source=fl2, gal_type=gal_type, gal_params=gal_params,
-                                     sky_rate=bgd_band2)
-        image_rate2 = image2 / exposure
+                                     sky_rate=bgd_band2, out=image_buffer)
+        np.divide(image2.to_value(u.ph), expo_val, out=imgs_D2[i])
+        image_rate2 = lightcurve['imgs_D2'][i]
         image_bkg, image_bkg_rms_median = \
             estimate_background(image_rate2, method='1D', sigma=2)
-        image_rate_bkgsub = image_rate2 - image_bkg
-
-        lightcurve['imgs_D2'][i] = image_rate2
-        lightcurve['imgs_D2_bkgsub'][i] = image_rate_bkgsub
+        lightcurve['imgs_D2_bkgsub'][i] = image_rate2 - image_bkg
 
     if debug:
         outfile = debugfilename
@@ -584,13 +680,40 @@ def construct_images_from_lightcurve(lightcurve, exposure, duet=None,
     return lightcurve
 
 
+def _measure_flux(image_rate, image_rate_bkgsub, ref_rate, ref_rate_bkgsub,
+                  threshold, star_tbl, duet):
+    """Fit the source flux in the difference image with ``daophot``.
+
+    Returns the fitted count rate and its uncertainty, without units.
+    """
+    diff_image = calculate_diff_image(image_rate, image_rate_bkgsub,
+                                      ref_rate, ref_rate_bkgsub,
+                                      duet=duet)
+
+    with suppress_stdout():
+        result, _ = run_daophot(diff_image, threshold,
+                                star_tbl, niters=1, snr_lim=0., duet=duet)
+
+    return result['flux_fit'][0], result['flux_unc'][0]
+
+
+def _map(func, *iterables, nproc=1, chunksize=1):
+    """Lazily map ``func`` on the iterables, using ``nproc`` processes."""
+    if nproc <= 1:
+        yield from map(func, *iterables)
+        return
+
+    with ProcessPoolExecutor(max_workers=nproc) as executor:
+        yield from executor.map(func, *iterables, chunksize=chunksize)
+
+
 def lightcurve_through_image(lightcurve, exposure,
                              frame=np.array([30, 30]),
                              final_resolution=None,
                              duet=None,
                              gal_type=None, gal_params=None,
                              debug=False, debugfilename='lightcurve',
-                             silent=False):
+                             silent=False, nproc=1):
     """Transform a theoretical light curve into a flux measurement.
 
     1. Take the values of a light curve, optionally rebin it to a new time
@@ -627,6 +750,9 @@ def lightcurve_through_image(lightcurve, exposure,
         File to save the light curves to
     silent : bool
         Suppress progress bars
+    nproc : int or None, default 1
+        Number of processes used to measure the fluxes in the images. If
+        None or 0, use all the available cores
 
     Returns
     -------
@@ -637,12 +763,13 @@ def lightcurve_through_image(lightcurve, exposure,
         intermediate images and their errorbars.
     """
     from astropy.table import Table
-    lightcurve = copy.deepcopy(lightcurve)
     if silent:
         tqdm = lambda x: x
     else:
         tqdm = imported_tqdm
 
+    nproc = max(1, nproc or os.cpu_count() or 1)
+
     with suppress_stdout():
         if duet is None:
             duet = Telescope()
@@ -660,10 +787,12 @@ def lightcurve_through_image(lightcurve, exposure,
     if debug:
         mkdir_p(debugdir)
 
-    good = (lightcurve['fluence_D1'] > 0) & (lightcurve['fluence_D2'] > 0)
+    good = (np.asarray(lightcurve['fluence_D1']) > 0) & \
+        (np.asarray(lightcurve['fluence_D2']) > 0)
     if not np.any(good):
         log.warning("Light curve has no points with fluence > 0")
         return
+    # Boolean indexing returns a copy: the input table is never modified
     lightcurve = lightcurve[good]
 
     lightcurve = \
@@ -757,65 +886,54 @@ def lightcurve_through_image(lightcurve, exposure,
         lightcurve = rebin_lightcurve(lightcurve, exposure, final_resolution,
                                       debug=debug)
 
-    for duet_no in [1, 2]:
-        for suffix in ['', 'err']:
-            colname = f'fluence_D{duet_no}_fit{suffix}'
-            lightcurve[colname] = 0.
-            lightcurve[colname].unit = u.ph / (u.cm**2 * u.s)
-            colname = f'ABmag_D{duet_no}_fit{suffix}'
-            lightcurve[colname] = 0.
-
-    lightcurve['snr_D1'] = 0.
-    lightcurve['snr_D2'] = 0.
     # Generate light curve
     log.info('Measuring fluxes and creating light curve')
-    for i, row in enumerate(tqdm(lightcurve)):
-        time = row['time']
-
-        image_rate1 = lightcurve['imgs_D1'][i]
-        image_rate_bkgsub1 = lightcurve['imgs_D1_bkgsub'][i]
-
-        diff_image1 = calculate_diff_image(image_rate1, image_rate_bkgsub1,
-                                           ref_image_rate1, ref_rate_bkgsub1,
-                                           duet=duet)
-
-        with suppress_stdout():
-            result1, _ = run_daophot(diff_image1, threshold,
-                                     star_tbl, niters=1, snr_lim=0., duet=duet)
-
-        fl1_fit = result1['flux_fit'][0] * image_rate1.unit
-        fl1_fite = result1['flux_unc'][0] * image_rate1.unit
-        lightcurve['fluence_D1_fit'][i] = duet.rate_to_fluence(fl1_fit)
-        lightcurve['fluence_D1_fiterr'][i] = duet.rate_to_fluence(fl1_fite)
-        if (fl1_fit > 0) & (fl1_fite > 0):
-            lightcurve['snr_D1'][i] = fl1_fit / fl1_fite
-            lightcurve['ABmag_D1_fit'][i] = \
-                duet_fluence_to_abmag(lightcurve['fluence_D1_fit'][i], 1,
-                                      duet=duet).value
-            ABerr = 2.5 * np.log(1 + 1 / lightcurve['snr_D1'][i])
-            lightcurve['ABmag_D1_fiterr'][i] = ABerr
-
-        image_rate2 = lightcurve['imgs_D2'][i]
-        image_rate_bkgsub2 = lightcurve['imgs_D2_bkgsub'][i]
-
-        diff_image2 = calculate_diff_image(image_rate2, image_rate_bkgsub2,
-                                           ref_image_rate2, ref_rate_bkgsub2,
-                                           duet=duet)
-
-        with suppress_stdout():
-            result2, _ = run_daophot(diff_image2, threshold,
-                                     star_tbl, niters=1, snr_lim=0., duet=duet)
-        fl2_fit = result2['flux_fit'][0] * image_rate2.unit
-        fl2_fite = result2['flux_unc'][0] * image_rate2.unit
-
-        lightcurve['fluence_D2_fit'][i] = duet.rate_to_fluence(fl2_fit)
-        lightcurve['fluence_D2_fiterr'][i] = duet.rate_to_fluence(fl2_fite)
-        if (fl2_fit > 0) & (fl2_fite > 0):
-            lightcurve['snr_D2'][i] = fl2_fit / fl2_fite
-            lightcurve['ABmag_D2_fit'][i] = \
-                duet_fluence_to_abmag(lightcurve['fluence_D2_fit'][i], 2,
-                                      duet=duet).value
-            ABerr = 2.5 * np.log(1 + 1 / lightcurve['snr_D2'][i])
-            lightcurve['ABmag_D2_fiterr'][i] = ABerr
+    rate_unit = lightcurve['imgs_D1'].unit
+    fluence_unit = u.ph / (u.cm**2 * u.s)
+    nrows = len(lightcurve)
+    measure = partial(_measure_flux, threshold=threshold, star_tbl=star_tbl,
+                      duet=duet)
+    # Rows of both detectors are independent: measure them in one go
+    images = chain(lightcurve['imgs_D1'], lightcurve['imgs_D2'])
+    images_bkgsub = chain(lightcurve['imgs_D1_bkgsub'],
+                          lightcurve['imgs_D2_bkgsub'])
+    ref_rates = [ref_image_rate1] * nrows + [ref_image_rate2] * nrows
+    ref_rates_bkgsub = [ref_rate_bkgsub1] * nrows + [ref_rate_bkgsub2] * nrows
+    chunksize = max(1, 2 * nrows // (4 * nproc))
+    measurements = _map(measure, images, images_bkgsub, ref_rates,
+                        ref_rates_bkgsub, nproc=nproc, chunksize=chunksize)
+    # Iterate on a sized range, so that the progress bar has a total
+    results = [r for _, r in zip(tqdm(range(2 * nrows)), measurements)]
+    results = np.reshape(results, (2, nrows, 2))
+    flux_fit = results[:, :, 0]
+    flux_unc = results[:, :, 1]
+
+    # Fill the new columns all at once
+    detected = (flux_fit > 0) & (flux_unc > 0)
+    snrs = np.zeros_like(flux_fit)
+    snrs[detected] = flux_fit[detected] / flux_unc[detected]
+    for duet_no in [1, 2]:
+        fl_fit = flux_fit[duet_no - 1]
+        fl_fite = flux_unc[duet_no - 1]
+        fluence_fit = duet.rate_to_fluence(fl_fit * rate_unit).to(fluence_unit)
+        detected_band = detected[duet_no - 1]
+        snr = snrs[duet_no - 1]
+
+        abmag = np.zeros(len(lightcurve))
+        abmag[detected_band] = \
+            duet_fluence_to_abmag(fluence_fit[detected_band], duet_no,
+                                  duet=duet).value
+        abmag_err = np.zeros(len(lightcurve))
+        abmag_err[detected_band] = 2.5 * np.log(1 + 1 / snr[detected_band])
+
+        lightcurve[f'fluence_D{duet_no}_fit'] = fluence_fit
+        lightcurve[f'ABmag_D{duet_no}_fit'] = abmag
+        lightcurve[f'fluence_D{duet_no}_fiterr'] = \
+            duet.rate_to_fluence(fl_fite * rate_unit).to(fluence_unit)
+        lightcurve[f'ABmag_D{duet_no}_fiterr'] = abmag_err
+
+    # The SNR columns come last
+    for duet_no in [1, 2]:
+        lightcurve[f'snr_D{duet_no}'] = snrs[duet_no - 1]
 
     return lightcurve
@@ -4,7 +4,7 @@ from astropy import log
 import numpy as np
 import astropy.units as u
 import astropy.constants as const
-from astropy.table import Table, QTable, join
+from astropy.table import Table, QTable
 
 from astroduet.config import Telescope
 from astroduet.bbmag import bb_abmag, bb_abmag_fluence
@@ -258,13 +258,17 @@ def convert_sn_model(label, name='NoName', duet=None):
     bandtwo = duet.bandpass2
     dist0 = 10*u.pc
 
-    temptable = \
-        Table.read(f'{label}_teff.txt', format='ascii', names=['time', 'T'])
-    radiustable = \
-        Table.read(f'{label}_radius.txt', format='ascii', names=['time', 'R'])
-    table = join(temptable, radiustable)
-    N = len(table['time'])
-    time = table['time'] * u.s
+    temp_data = np.loadtxt(f'{label}_teff.txt')
+    radius_data = np.loadtxt(f'{label}_radius.txt')
+    # Only keep times present in both files (both are sorted in time)
+    temp_good = np.isin(temp_data[:, 0], radius_data[:, 0])
+    radius_good = np.isin(radius_data[:, 0], temp_data[:, 0])
+    temp_data = temp_data[temp_good]
+    radius_data = radius_data[radius_good]
+    N = len(temp_data)
+    time = temp_data[:, 0] * u.s
+    temps = temp_data[:, 1] * u.K
+    radii = radius_data[:, 1] * u.cm
 
     shock_lc = Table([time,
             np.zeros(len(time))*u.ABmag,
@@ -275,10 +279,8 @@ def convert_sn_model(label, name='NoName', duet=None):
                meta={'name': name + ' at 10 pc',
                       'dist0_pc' : '{}'.format(dist0.to(u.pc).value)})
 
-    bolflux = (table['T'] * u.K) ** 4 * const.sigma_sb.cgs * (
-                (table['R'] * u.cm) / dist0.to(u.cm)) ** 2
-
-    temps = table['T'] * u.K
+    bolflux = temps ** 4 * const.sigma_sb.cgs * (
+                radii / dist0.to(u.cm)) ** 2
 
     for k, t, bf in tqdm(list(zip(np.arange(N), temps, bolflux))):
         band1_mag, band2_mag = bb_abmag(bbtemp=t, bolflux = bf,
@@ -391,7 +393,8 @@ def load_model_fluence(filename, dist=100*u.Mpc):
 
     dist0 = float(model_lc_table.meta['DIST0_PC']) * u.pc
 
-    distscale = (dist0.to(u.Mpc) / dist)**2
+    # Plain float, so that the fluences keep their units
+    distscale = (dist0 / dist).to(u.dimensionless_unscaled).value ** 2
 
     fluence1 = model_lc_table['fluence_D1'] * distscale
     fluence2 = model_lc_table['fluence_D2'] * distscale
@@ -0,0 +1,23 @@
+import numpy as np
+import astropy.units as u
+from astroduet.config import Telescope
+from astroduet.image_utils import construct_image
+
+
+def test_construct_image_out():
+    duet = Telescope()
+    frame = np.array([30, 30])
+    kwargs = dict(duet=duet, band=duet.bandpass1, source=1 * u.ph / u.s,
+                  sky_rate=0.1 * u.ph / u.s, n_exp=2)
+
+    np.random.seed(42)
+    image = construct_image(frame, 300 * u.s, **kwargs)
+
+    # Non-zero buffer: it must be cleared before co-adding the exposures
+    out = np.ones(frame) * 1000.
+    np.random.seed(42)
+    image_out = construct_image(frame, 300 * u.s, out=out, **kwargs)
+
+    assert np.shares_memory(image_out.value, out)
+    assert image_out.unit == image.unit
+    assert np.all(image_out.value == image.value)
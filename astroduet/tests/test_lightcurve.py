@@ -70,3 +70,20 @@ def test_numerically_realistic_lightcurve():
 
 #    assert np.allclose(np.mean(fl1_out), ref_fluence.value, rtol=0.1)
 #    assert np.allclose(np.mean(fl2_out), ref_fluence.value, rtol=0.1)
+
+
+def test_lightcurve_through_image_nproc():
+    import numpy as np
+
+    lc = QTable({'time': [150, 450] * u.s,
+                'fluence_D1':  [4, 6] * (u.ph / u.cm**2 / u.s),
+                'fluence_D2': [3, 1] * (u.ph / u.cm**2 / u.s)})
+    np.random.seed(1234)
+    lc_serial = lightcurve_through_image(lc, 300 * u.s, silent=True, nproc=1)
+    np.random.seed(1234)
+    lc_parallel = lightcurve_through_image(lc, 300 * u.s, silent=True,
+                                           nproc=2)
+
+    for col in ['fluence_D1_fit', 'fluence_D1_fiterr', 'snr_D1',
+                'fluence_D2_fit', 'fluence_D2_fiterr', 'snr_D2']:
+        assert np.all(lc_serial[col] == lc_parallel[col])
@@ -1,4 +1,5 @@
 from contextlib import contextmanager
+from functools import lru_cache
 import os
 import sys
 
@@ -11,6 +12,18 @@ except ImportError:
     def tqdm(x):
         return x
 
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """Dummy decorator in case Numba is not installed."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
 curdir = os.path.dirname(__file__)
 datadir = os.path.join(curdir, 'data')
 
@@ -116,11 +129,14 @@ def duet_fluence_to_abmag_old(fluence, band, **kwargs):
     return ABmag
 
 
+@lru_cache(maxsize=1)
 def load_neff():
     """
     Load number of effective background pixels in the PSF from
     file provided by Rick Cook.
 
+    The file is only read once; the returned arrays are read-only.
+
     ----
     Returns
 
@@ -136,7 +152,12 @@ def load_neff():
     neff_table = Table.read(ref_file, format='ascii')
 
 #    oversig, oversample, neff_center, neff_corner, neff_avg = genfromtxt(ref_file, unpack=True, skip_header=True)
-    return neff_table['pix-fwhm'].data, neff_table['avg'].data
+    over = neff_table['pix-fwhm'].data
+    neff = neff_table['avg'].data
+    # Shared between calls, so protect them from modification
+    over.flags.writeable = False
+    neff.flags.writeable = False
+    return over, neff
 
 
 def get_neff(psf_size, pixel_size):